@@ -1,221 +1,469 @@
-#Sistema de processamento de consultas booleanas e cálculo de relevância
-
-import re
-
-
-class ProcessadorBusca:
-    
-    #Processa consultas booleanas (AND/OR + parênteses), calcula relevância por média de z-scores e gera snippets.
-    
-
-    def __init__(self, indexador):
-        # guardamos a referência do indexador para consultar postings, z-score etc
-        self.indexador = indexador
-
-    # tokenização + normalização 
-
-    def _tokenizar_consulta(self, consulta: str) -> list[str]:
-        
-        #Tokeniza a consulta preservando AND/OR e parênteses
-        #AND/OR ficam em MAIÚSCULAS
-        #termos ficam minúsculos e sem pontuação
-        #**extra**: insere AND implícito entre termos adjacentes
-        
-        tokens = []
-        atual = ""
-        em_aspas = False
-
-        # varre caractere a caractere para respeitar aspas e parênteses
-        for ch in consulta:
-            if ch == '"':
-                em_aspas = not em_aspas
-                if atual.strip():
-                    tokens.append(atual.strip())
-                    atual = ""
-            elif ch in "()" and not em_aspas:
-                if atual.strip():
-                    tokens.append(atual.strip())
-                    atual = ""
-                tokens.append(ch)
-            elif ch.isspace() and not em_aspas:
-                if atual.strip():
-                    tokens.append(atual.strip())
-                    atual = ""
-            else:
-                atual += ch
-
-        if atual.strip():
-            tokens.append(atual.strip())
-
-        # normaliza (AND/OR maiúsculos; termos minúsculos sem pontuação)
-        normalizados: list[str] = []
-        for t in tokens:
-            if t.upper() in ("AND", "OR"):
-                normalizados.append(t.upper())
-            elif t in ("(", ")"):
-                normalizados.append(t)
-            else:
-                termo = re.sub(r"[^\w\s]", "", t.lower())
-                if termo:
-                    normalizados.append(termo)
-
-        # insere AND implícito entre termos adjacentes
-        # regra: se token atual é termo/")" e o próximo é termo/"("
-        corrigidos: list[str] = []
-        for i, t in enumerate(normalizados):
-            corrigidos.append(t)
-            if i < len(normalizados) - 1:
-                prox = normalizados[i + 1]
-                # Se o token atual é termo/")" e o próximo é termo/"(", então falta um AND
-                cond_atual_e_termo = t not in ("AND", "OR", "(", ")")
-                cond_prox_termo_ou_abre = prox not in ("AND", "OR", ")")
-                if cond_atual_e_termo and cond_prox_termo_ou_abre:
-                    corrigidos.append("AND")
-
-        return corrigidos
-
-    # infixa -> RPN (shunting-yard) 
-
-    def _para_rpn(self, tokens: list[str]) -> list[str]:
-        
-        #Converte a expressão infixa para Notação Polonesa Reversa (RPN)
-        
-        saida = []
-        pilha = []
-        precedencia = {"OR": 1, "AND": 2}  # AND tem maior precedência
-
-        for tok in tokens:
-            if tok == "(":
-                pilha.append(tok)
-            elif tok == ")":
-                while pilha and pilha[-1] != "(":
-                    saida.append(pilha.pop())
-                if pilha and pilha[-1] == "(":
-                    pilha.pop()
-            elif tok in ("AND", "OR"):
-                while pilha and pilha[-1] != "(" and precedencia.get(pilha[-1], 0) >= precedencia[tok]:
-                    saida.append(pilha.pop())
-                pilha.append(tok)
-            else:
-                saida.append(tok)
-
-        while pilha:
-            saida.append(pilha.pop())
-
-        return saida
-
-    # avaliação da expressão em RPN 
-
-    def _avaliar_rpn(self, rpn_tokens: list[str]) -> set[str]:
-        
-        #Avalia a expressão booleana usando conjuntos de documentos
-        
-        pilha: list[set[str]] = []
-
-        for tok in rpn_tokens:
-            if tok == "AND":
-                if len(pilha) >= 2:
-                    b = pilha.pop()
-                    a = pilha.pop()
-                    pilha.append(a & b)
-            elif tok == "OR":
-                if len(pilha) >= 2:
-                    b = pilha.pop()
-                    a = pilha.pop()
-                    pilha.append(a | b)
-            else:
-                # termo de busca -> conjunto de docs onde ele aparece
-                docs = set(self.indexador.obter_postings(tok).keys())
-                pilha.append(docs)
-
-        return pilha[0] if pilha else set()
-
-    # API de alto nível
-
-    def processar_consulta(self, consulta: str) -> list[str]:
-        
-        #Pipeline: tokeniza -> converte pra RPN -> avalia -> devolve lista de docs
-        
-        if not self.indexador.indice_carregado:
-            return []
-
-        try:
-            tokens = self._tokenizar_consulta(consulta)
-            rpn = self._para_rpn(tokens)
-            docs = self._avaliar_rpn(rpn)
-            return list(docs)
-        except Exception as e:
-            # não interrompe o servidor se a consulta for inválida
-            print(f"Erro ao processar consulta '{consulta}': {e}")
-            return []
-
-    def calcular_relevancia(self, documentos: list[str], consulta_original: str) -> list[dict]:
-        
-        #Relevância = média dos z-scores dos termos da consulta no documento
-        #(Se sigma for 0, z-score daquele termo vira 0; média dos que tiverem valor)
-        
-        tokens = self._tokenizar_consulta(consulta_original)
-        termos = [t for t in tokens if t not in ("AND", "OR", "(", ")")]
-
-        resultados = []
-        for doc in documentos:
-            zscores = [self.indexador.calcular_zscore(t, doc) for t in termos]
-            z_validos = [z for z in zscores if z != 0]
-            relevancia = sum(z_validos) / len(z_validos) if z_validos else 0.0
-            resultados.append({
-                "documento": doc,
-                "relevancia": relevancia,
-                "z_scores": zscores
-            })
-
-        # maior relevância primeiro
-        resultados.sort(key=lambda x: x["relevancia"], reverse=True)
-        return resultados
-
-    def buscar(self, consulta: str) -> list[dict]:
-        
-        #Processa a consulta e devolve os resultados já ordenados por relevância
-        
-        docs = self.processar_consulta(consulta)
-        return self.calcular_relevancia(docs, consulta)
-
-    def gerar_snippet(self, documento: str, consulta: str, tamanho: int = 80) -> str:
-        
-        #Snippet = 80 caracteres antes e 80 depois do primeiro termo encontrado
-        
-        conteudo = self.indexador.documentos.get(documento, "")
-        if not conteudo:
-            return ""
-
-        tokens = self._tokenizar_consulta(consulta)
-        termos = [t for t in tokens if t not in ("AND", "OR", "(", ")")]
-
-        melhor_pos = -1
-        melhor_termo = ""
-        txt_lower = conteudo.lower()
-
-        for termo in termos:
-            pos = txt_lower.find(termo.lower())
-            if pos != -1 and (melhor_pos == -1 or pos < melhor_pos):
-                melhor_pos = pos
-                melhor_termo = termo
-
-        if melhor_pos == -1:
-            # se nada for encontrado → devolve começo do documento
-            trecho = conteudo[: 2 * tamanho]
-            return (trecho + "...") if len(conteudo) > 2 * tamanho else trecho
-
-        ini = max(0, melhor_pos - tamanho)
-        fim = min(len(conteudo), melhor_pos + len(melhor_termo) + tamanho)
-        trecho = conteudo[ini:fim]
-
-        # destaca todos os termos 
-        for termo in termos:
-            trecho = re.sub(rf"({re.escape(termo)})", r"<mark>\1</mark>", trecho, flags=re.IGNORECASE)
-
-        if ini > 0:
-            trecho = "..." + trecho
-        if fim < len(conteudo):
-            trecho = trecho + "..."
-
-        return trecho
+#Sistema de processamento de consultas booleanas e cálculo de relevância
+
+import heapq
+import re
+import string
+from collections import OrderedDict
+
+# limites dos caches (consultas repetidas são muito comuns em busca)
+TAM_CACHE_RESULTADOS = 512
+TAM_CACHE_TERMOS = 4096
+
+# um token é: frase entre aspas | parêntese | palavra (sem espaço/parêntese/aspa)
+_RE_TOKEN_CONSULTA = re.compile(r'"([^"]*)"|([()])|([^\s()"]+)')
+
+# tokens que não são termos de busca (teste de pertinência O(1))
+_NAO_TERMOS = frozenset(("AND", "OR", "(", ")"))
+
+# tabela C-level pra remover pontuação dos termos (bem mais rápida que re.sub)
+_TABELA_PONTUACAO = str.maketrans("", "", string.punctuation)
+
+# profundidade máxima de grupos aninhados que o parser desce — cada '(' vira
+# um nível de recursão e a consulta chega da URL sem limite de tamanho, então
+# sem teto uma query com milhares de '(' estouraria a pilha; acima do teto os
+# parênteses excedentes são simplesmente ignorados
+MAX_ANINHAMENTO = 64
+
+
+class ProcessadorBusca:
+    
+    #Processa consultas booleanas (AND/OR + parênteses), calcula relevância por média de z-scores e gera snippets.
+    
+
+    def __init__(self, indexador):
+        # guardamos a referência do indexador para consultar postings, z-score etc
+        self.indexador = indexador
+        # cache dos regexes de termos já compilados (evita recompilar por snippet)
+        self._cache_regex_termos = {}
+        # caches de consulta: resultado completo (LRU) e conjunto de docs por termo
+        self._cache_resultados = OrderedDict()
+        self._cache_docs_termo = {}
+        self._versao_indice_cache = -1
+
+    def _sincronizar_com_indice(self):
+
+        #Esvazia os caches se o índice foi (re)carregado desde a última consulta
+
+        versao = self.indexador.versao_indice
+        if versao != self._versao_indice_cache:
+            self._cache_resultados.clear()
+            self._cache_docs_termo.clear()
+            self._versao_indice_cache = versao
+
+    def _docs_para_termo(self, termo: str) -> frozenset:
+
+        #Conjunto (imutável) de ids de docs onde o termo aparece, com cache
+        #Ids inteiros deixam as interseções/uniões sem hash de caminho
+
+        docs = self._cache_docs_termo.get(termo)
+        if docs is None:
+            if len(self._cache_docs_termo) >= TAM_CACHE_TERMOS:
+                self._cache_docs_termo.clear()
+            ids = self.indexador.doc_ids
+            docs = frozenset(ids[d] for d in self.indexador.postings.get(termo, {}))
+            self._cache_docs_termo[termo] = docs
+        return docs
+
+    def _compilar_regex_termos(self, termos: list[str]):
+
+        #Compila um único regex com todos os termos (alternação) e reaproveita
+        #entre os snippets da mesma consulta
+
+        chave = tuple(termos)
+        regex = self._cache_regex_termos.get(chave)
+        if regex is None:
+            if len(self._cache_regex_termos) >= 64:
+                self._cache_regex_termos.clear()
+            padrao = "(" + "|".join(re.escape(t) for t in termos) + ")"
+            regex = re.compile(padrao, re.IGNORECASE)
+            self._cache_regex_termos[chave] = regex
+        return regex
+
+    # tokenização + normalização 
+
+    def _tokenizar_consulta(self, consulta: str) -> tuple[list[str], list[str]]:
+        
+        #Tokeniza a consulta preservando AND/OR e parênteses
+        #AND/OR ficam em MAIÚSCULAS
+        #termos ficam minúsculos e sem pontuação
+        #**extra**: insere AND implícito entre termos adjacentes
+        #Devolve (tokens, termos): os termos já saem filtrados na mesma passada
+        
+        # uma única varredura do regex substitui o loop caractere a caractere
+        tokens = []
+        for m in _RE_TOKEN_CONSULTA.finditer(consulta):
+            frase, parentese, palavra = m.groups()
+            if frase is not None:
+                frase = frase.strip()
+                if frase:
+                    tokens.append(frase)
+            elif parentese:
+                tokens.append(parentese)
+            else:
+                tokens.append(palavra)
+
+        # normaliza (AND/OR maiúsculos; termos minúsculos sem pontuação)
+        # e já separa os termos de busca na mesma passada
+        normalizados: list[str] = []
+        termos: list[str] = []
+        for t in tokens:
+            if t.upper() in ("AND", "OR"):
+                normalizados.append(t.upper())
+            elif t in ("(", ")"):
+                normalizados.append(t)
+            else:
+                termo = t.lower().translate(_TABELA_PONTUACAO)
+                if termo:
+                    normalizados.append(termo)
+                    termos.append(termo)
+
+        # insere AND implícito entre termos adjacentes
+        # regra: se token atual é termo/")" e o próximo é termo/"("
+        corrigidos: list[str] = []
+        for i, t in enumerate(normalizados):
+            corrigidos.append(t)
+            if i < len(normalizados) - 1:
+                prox = normalizados[i + 1]
+                # Se o token atual é termo/")" e o próximo é termo/"(", então falta um AND
+                cond_atual_e_termo = t not in _NAO_TERMOS
+                cond_prox_termo_ou_abre = prox not in ("AND", "OR", ")")
+                if cond_atual_e_termo and cond_prox_termo_ou_abre:
+                    corrigidos.append("AND")
+
+        return corrigidos, termos
+
+    # infixa -> RPN (parser de precedência)
+
+    def _para_rpn(self, tokens: list[str]) -> list[str]:
+
+        #Converte a expressão infixa para Notação Polonesa Reversa (RPN)
+        #Parser recursivo por precedência: comparações diretas com AND/OR,
+        #sem pilha de operadores nem dict de precedência; tudo é emitido
+        #numa única lista de saída
+        #Consultas bem formadas produzem o mesmo RPN do shunting-yard antigo.
+        #Malformadas (parêntese/operador solto, ex: ") x or y") saem na ordem
+        #em que vieram e normalmente são rejeitadas pela validação de aridade
+        #— mais estrito que o conversor antigo, que às vezes reordenava os
+        #tokens perdidos em algo avaliável
+
+        saida: list[str] = []
+        n = len(tokens)
+
+        def primario(i: int, prof: int) -> int:
+            # termo simples ou grupo entre parênteses
+            while i < n:
+                tok = tokens[i]
+                if tok == "(":
+                    if prof >= MAX_ANINHAMENTO:
+                        # fundo demais: o '(' deixa de abrir grupo (e de
+                        # recursar) e é só pulado
+                        i += 1
+                        continue
+                    i = expressao(i + 1, 1, prof + 1)
+                    if i < n and tokens[i] == ")":
+                        i += 1
+                    return i
+                if tok not in _NAO_TERMOS:
+                    saida.append(tok)
+                    return i + 1
+                return i
+            return i
+
+        def expressao(i: int, prec_min: int, prof: int) -> int:
+            # consome operandos ligados por operadores de precedência >= prec_min
+            # (AND = 2 liga mais forte que OR = 1; ambos associativos à esquerda)
+            i = primario(i, prof)
+            while i < n:
+                tok = tokens[i]
+                if tok == "AND":
+                    prec = 2
+                elif tok == "OR":
+                    prec = 1
+                else:
+                    break
+                if prec < prec_min:
+                    break
+                i = expressao(i + 1, prec + 1, prof)
+                saida.append(tok)
+            return i
+
+        i = expressao(0, 1, 0)
+        if i != n:
+            # sobrou token não consumido (consulta malformada): emite o resto
+            # na ordem em que veio (sem parênteses) e a validação de aridade
+            # decide — em geral rejeitando, diferente do conversor antigo
+            saida.extend(t for t in tokens[i:] if t not in ("(", ")"))
+
+        return saida
+
+    def _validar_rpn(self, rpn_tokens: list[str]) -> bool:
+
+        #Simula a profundidade da pilha: cada operador consome 2 operandos
+        #e a expressão válida termina com exatamente 1 resultado
+
+        profundidade = 0
+        for tok in rpn_tokens:
+            if tok in ("AND", "OR"):
+                if profundidade < 2:
+                    return False
+                profundidade -= 1
+            else:
+                profundidade += 1
+        return profundidade == 1
+
+    # avaliação da expressão em RPN
+
+    def _avaliar_rpn(self, rpn_tokens: list[str]) -> set[int]:
+
+        #Monta a árvore da expressão e anota cada nó com uma estimativa de
+        #tamanho (folha = df do termo; AND = min dos lados; OR = soma).
+        #A avaliação usa as estimativas pra resolver primeiro o lado menor
+        #de cada AND e cortar a subárvore oposta quando ele vem vazio
+
+        # nó = (op, conteudo, estimativa); folha tem op None e conteudo = termo
+        pilha = []
+        for tok in rpn_tokens:
+            if tok in ("AND", "OR"):
+                if len(pilha) < 2:
+                    continue
+                b = pilha.pop()
+                a = pilha.pop()
+                est = min(a[2], b[2]) if tok == "AND" else a[2] + b[2]
+                pilha.append((tok, (a, b), est))
+            else:
+                pilha.append((None, tok, len(self.indexador.postings.get(tok, {}))))
+
+        return self._avaliar_no(pilha[0]) if pilha else set()
+
+    def _avaliar_no(self, no) -> set[int]:
+
+        #Avalia a árvore da expressão em pós-ordem com pilha explícita
+        #(uma consulta longa de ANDs implícitos vira uma árvore com um nó
+        #por termo; recursão aqui estouraria a pilha do interpretador)
+        #Cada quadro é (nó, fase): fase 0 agenda o 1º filho, fase 1 o 2º
+        #(ou corta, no AND com lado vazio), fase 2 combina os resultados
+
+        pilha = [(no, 0, None)]
+        resultado: set = set()
+        while pilha:
+            no_atual, fase, parcial = pilha.pop()
+            op, conteudo, _ = no_atual
+
+            if op is None:
+                # folha: docs do termo (frozenset em cache); só o resultado
+                # combinado dos operadores vira set novo
+                resultado = self._docs_para_termo(conteudo)
+                continue
+
+            # resolve primeiro o lado do AND com estimativa menor (a troca é
+            # determinística, então cada fase enxerga a mesma ordem)
+            esq, dire = conteudo
+            if op == "AND" and dire[2] < esq[2]:
+                esq, dire = dire, esq
+
+            if fase == 0:
+                pilha.append((no_atual, 1, None))
+                pilha.append((esq, 0, None))
+            elif fase == 1:
+                if op == "AND" and not resultado:
+                    # lado menor vazio: a interseção é vazia e o outro lado
+                    # nem é materializado
+                    resultado = set()
+                    continue
+                pilha.append((no_atual, 2, resultado))
+                pilha.append((dire, 0, None))
+            else:
+                if op == "AND":
+                    a, b = parcial, resultado
+                    if len(b) < len(a):
+                        a, b = b, a
+                    resultado = a & b
+                else:
+                    # OR: precisa dos dois lados de qualquer forma
+                    resultado = parcial | resultado
+
+        return resultado
+
+    # API de alto nível
+
+    def extrair_termos(self, consulta: str) -> list[str]:
+
+        #Versão pública: tokeniza a consulta e devolve só os termos
+        #(usada pelo app pra reaproveitar os termos nos snippets)
+
+        return self._tokenizar_consulta(consulta)[1]
+
+    def processar_consulta(self, consulta: str, tokens: list[str] = None) -> list[str]:
+
+        #Pipeline: tokeniza -> converte pra RPN -> avalia -> devolve lista de docs
+        #tokens pode vir pronto de quem já tokenizou (evita retrabalho)
+
+        if not self.indexador.indice_carregado:
+            return []
+
+        if tokens is None:
+            tokens, _ = self._tokenizar_consulta(consulta)
+
+        # caso mais comum: termo único dispensa parser e avaliação booleana
+        if len(tokens) == 1 and tokens[0] not in _NAO_TERMOS:
+            return list(self.indexador.postings.get(tokens[0], {}).keys())
+
+        rpn = self._para_rpn(tokens)
+        if not rpn:
+            return []
+
+        # valida antes de avaliar (sem try/except engolindo bugs reais)
+        if not self._validar_rpn(rpn):
+            print(f"Consulta inválida: '{consulta}'")
+            return []
+
+        # a avaliação devolve ids; converte de volta pra caminhos no final
+        ids_docs = self._avaliar_rpn(rpn)
+        docs_por_id = self.indexador.docs_por_id
+        return [docs_por_id[i] for i in ids_docs]
+
+    def calcular_relevancia(self, documentos: list[str], consulta_original: str, termos: list[str] = None, limite: int = None) -> list[dict]:
+
+        #Relevância = média dos z-scores dos termos da consulta no documento
+        #(Se sigma for 0, z-score daquele termo vira 0; média dos que tiverem valor)
+        #limite: quando informado, devolve só os `limite` mais relevantes
+        #(top-K via heap, O(N log K) em vez de ordenar tudo)
+
+        if termos is None:
+            termos = self.extrair_termos(consulta_original)
+
+        # média/desvio de cada termo vêm pré-calculados no indexador
+        # (só mudam quando o índice muda, não a cada consulta)
+        stats_termos = []
+        for t in termos:
+            docs_tf = self.indexador.postings.get(t, {})
+            if docs_tf:
+                media, desvio = self.indexador.obter_stats_termo(t)
+            else:
+                media = 0.0
+                desvio = 0.0
+            stats_termos.append((docs_tf, media, desvio))
+
+        # só termos com desvio > 0 entram no loop quente (os outros dão sempre 0);
+        # o .get de cada postings fica ligado uma vez, fora do loop por documento
+        n_termos = len(termos)
+        termos_ativos = [
+            (i, docs_tf.get, media, desvio)
+            for i, (docs_tf, media, desvio) in enumerate(stats_termos)
+            if desvio > 0.0
+        ]
+
+        resultados = []
+        for doc in documentos:
+            zscores = [0.0] * n_termos
+            soma = 0.0
+            validos = 0
+            for i, obter_tf, media, desvio in termos_ativos:
+                z = (obter_tf(doc, 0) - media) / desvio
+                if z != 0.0:
+                    zscores[i] = z
+                    soma += z
+                    validos += 1
+            relevancia = soma / validos if validos else 0.0
+            resultados.append({
+                "documento": doc,
+                "relevancia": relevancia,
+                "z_scores": zscores
+            })
+
+        # maior relevância primeiro; com limite, só os K melhores interessam
+        if limite is not None and limite < len(resultados):
+            return heapq.nlargest(limite, resultados, key=lambda x: x["relevancia"])
+        resultados.sort(key=lambda x: x["relevancia"], reverse=True)
+        return resultados
+
+    def buscar(self, consulta: str, limite: int = None) -> tuple[list[dict], int]:
+
+        #Processa a consulta e devolve (resultados, total)
+        #resultados: ordenados por relevância, truncados em `limite` se informado
+        #total: quantidade de documentos casados (pro app montar a paginação)
+        #Tokeniza uma única vez e repassa tokens/termos pro resto do pipeline
+        #Consultas repetidas saem direto do cache LRU
+
+        self._sincronizar_com_indice()
+        chave = (consulta, limite)
+        cacheado = self._cache_resultados.get(chave)
+        if cacheado is not None:
+            self._cache_resultados.move_to_end(chave)
+            return cacheado
+
+        tokens, termos = self._tokenizar_consulta(consulta)
+        docs = self.processar_consulta(consulta, tokens=tokens)
+        total = len(docs)
+        resultados = self.calcular_relevancia(docs, consulta, termos=termos, limite=limite)
+
+        self._cache_resultados[chave] = (resultados, total)
+        if len(self._cache_resultados) > TAM_CACHE_RESULTADOS:
+            self._cache_resultados.popitem(last=False)
+        return resultados, total
+
+    def gerar_snippets_lote(self, documentos: list[str], termos: list[str], tamanho: int = 80) -> list[str]:
+
+        #Gera os snippets de uma página inteira numa chamada só:
+        #os termos e o regex compilado são compartilhados entre todos os
+        #documentos, sem retokenizar a consulta por resultado
+
+        return [self.gerar_snippet(doc, "", tamanho=tamanho, termos=termos) for doc in documentos]
+
+    def gerar_snippet(self, documento: str, consulta: str, tamanho: int = 80, termos: list[str] = None) -> str:
+
+        #Snippet = 80 caracteres antes e 80 depois do primeiro termo encontrado
+
+        conteudo = self.indexador.documentos.get(documento, "")
+        if not conteudo:
+            return ""
+
+        if termos is None:
+            termos = self.extrair_termos(consulta)
+
+        if not termos:
+            trecho = conteudo[: 2 * tamanho]
+            return (trecho + "...") if len(conteudo) > 2 * tamanho else trecho
+
+        # índice de primeiras posições: acha o primeiro termo com lookups O(1)
+        # em vez de varrer o documento inteiro
+        posicoes = self.indexador.obter_primeiras_posicoes(documento)
+        melhor_pos = -1
+        melhor_termo = ""
+        restantes = []
+        for termo in termos:
+            pos = posicoes.get(termo)
+            if pos is None:
+                # frase com espaço ou fragmento de palavra: precisa de busca textual
+                restantes.append(termo)
+            elif melhor_pos == -1 or pos < melhor_pos:
+                melhor_pos = pos
+                melhor_termo = termo
+
+        if restantes:
+            m = self._compilar_regex_termos(restantes).search(
+                self.indexador.obter_conteudo_lower(documento))
+            if m is not None and (melhor_pos == -1 or m.start() < melhor_pos):
+                melhor_pos = m.start()
+                melhor_termo = m.group()
+
+        if melhor_pos == -1:
+            # se nada for encontrado → devolve começo do documento
+            trecho = conteudo[: 2 * tamanho]
+            return (trecho + "...") if len(conteudo) > 2 * tamanho else trecho
+
+        regex_termos = self._compilar_regex_termos(termos)
+
+        ini = max(0, melhor_pos - tamanho)
+        fim = min(len(conteudo), melhor_pos + len(melhor_termo) + tamanho)
+        trecho = conteudo[ini:fim]
+
+        # destaca todos os termos numa passada só
+        trecho = regex_termos.sub(r"<mark>\1</mark>", trecho)
+
+        if ini > 0:
+            trecho = "..." + trecho
+        if fim < len(conteudo):
+            trecho = trecho + "..."
+
+        return trecho
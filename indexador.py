@@ -5,11 +5,161 @@ Responsável por processar documentos e construir o índice de busca.
 
 import os
 import re
+import sys
 import math
 import json
+import pickle
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from types import MappingProxyType
 from trie import Trie
 
+# o quantificador {3,} já descarta tokens curtos (<=2), que são ruído
+# para este corpus; pontuação vira fronteira de token naturalmente
+_RE_TOKEN = re.compile(r"[a-z0-9]{3,}")
+
+# Tabela de 256 bytes pré-calculada: A-Z vira a-z (bit 5) e qualquer byte
+# fora de [a-z0-9] vira espaço. Com ela, minúsculas + fronteiras de token
+# saem numa única passada em C (translate + split), sem ramo por caractere.
+_TABELA_BYTES = bytes(
+    b | 32 if 65 <= b <= 90
+    else (b if 97 <= b <= 122 or 48 <= b <= 57 else 32)
+    for b in range(256)
+)
+
+
+# Stopwords do inglês (o corpus BBC é em inglês) com 3+ caracteres — as de
+# 1-2 caracteres o filtro de tamanho já descarta. Palavras funcionais assim
+# aparecem em quase todo documento: não ajudam o ranking e só inflam
+# postings, trie e índice em disco. Consequência documentada: buscar por
+# uma stopword passa a não casar nada (igual já acontece com termos de
+# 1-2 letras, que nunca foram indexados).
+_STOPWORDS = frozenset((
+    "the", "and", "for", "are", "but", "not", "was", "were", "his", "her",
+    "him", "has", "had", "have", "its", "this", "that", "with", "from",
+    "they", "them", "their", "been", "being", "will", "would", "could",
+    "should", "can", "may", "might", "must", "also", "than", "then",
+    "there", "here", "when", "where", "which", "who", "whom", "why", "how",
+    "all", "any", "both", "each", "few", "more", "most", "other", "some",
+    "such", "only", "own", "same", "too", "very", "just", "into",
+    "through", "during", "before", "after", "above", "below", "between",
+    "out", "over", "under", "again", "further", "once", "about",
+    "against", "does", "did", "doing", "until", "while",
+))
+# o filtro roda antes do decode, então a comparação é sobre bytes
+_STOPWORDS_BYTES = frozenset(p.encode("ascii") for p in _STOPWORDS)
+
+
+def _tokenizar_bytes(texto: str) -> list[str]:
+    # bytes >= 0x80 (UTF-8 multibyte) caem no "vira espaço" da tabela,
+    # então acentuados delimitam tokens igual ao regex sobre str
+    dados = texto.encode("utf-8", "ignore").translate(_TABELA_BYTES)
+    return [
+        t.decode("ascii")
+        for t in dados.split()
+        if len(t) > 2 and t not in _STOPWORDS_BYTES
+    ]
+
+
+def _varint_bytes(valores) -> bytes:
+    """
+    Codifica uma sequência de inteiros >= 0 como varints (7 bits por byte,
+    bit alto = continua). Deltas de ids ordenados e tfs são quase sempre
+    pequenos, então a maioria vira 1 byte.
+    """
+    out = bytearray()
+    escrever = out.append
+    for n in valores:
+        while n >= 0x80:
+            escrever((n & 0x7F) | 0x80)
+            n >>= 7
+        escrever(n)
+    return bytes(out)
+
+
+def _varint_lista(blob: bytes) -> list:
+    """Decodifica um blob de varints de volta para a lista de inteiros."""
+    out = []
+    n = 0
+    desloc = 0
+    for b in blob:
+        n |= (b & 0x7F) << desloc
+        if b & 0x80:
+            desloc += 7
+        else:
+            out.append(n)
+            n = 0
+            desloc = 0
+    return out
+
+
+class _DocumentosSobDemanda(dict):
+    """
+    dict caminho -> conteúdo que só lê o arquivo do disco no primeiro
+    acesso. A carga do índice deixa de fazer um open+read por documento;
+    quem pedir snippet/título paga a leitura uma única vez.
+    """
+
+    def __init__(self, caminhos=()):
+        super().__init__()
+        self._conhecidos = set(caminhos)
+
+    def __missing__(self, caminho):
+        if caminho not in self._conhecidos:
+            raise KeyError(caminho)
+        try:
+            with open(caminho, "r", encoding="utf-8", errors="ignore") as f:
+                conteudo = f.read()
+        except OSError as e:
+            print(f"Aviso: não consegui abrir {caminho}: {e}")
+            conteudo = ""
+        dict.__setitem__(self, caminho, conteudo)
+        return conteudo
+
+    def __setitem__(self, caminho, conteudo):
+        self._conhecidos.add(caminho)
+        dict.__setitem__(self, caminho, conteudo)
+
+    def __contains__(self, caminho):
+        return caminho in self._conhecidos
+
+    def __iter__(self):
+        return iter(self._conhecidos)
+
+    def __len__(self):
+        return len(self._conhecidos)
+
+    def keys(self):
+        # inclui os ainda não lidos (callers usam keys() como "todos os docs")
+        return self._conhecidos
+
+    def get(self, caminho, padrao=None):
+        if caminho in self._conhecidos:
+            return self[caminho]
+        return padrao
+
+
+def _processar_arquivo(caminho: str):
+    """
+    Worker do pool de processos: lê e tokeniza um arquivo do corpus.
+    Devolve (caminho, conteudo, tf_doc, num_tokens) ou None se vazio/ilegível.
+    Fica no nível do módulo para poder ser enviado aos processos filhos.
+    """
+    try:
+        with open(caminho, "r", encoding="utf-8", errors="ignore") as f:
+            conteudo = f.read().strip()
+    except OSError as e:
+        print(f"Erro ao processar {caminho}: {e}")
+        return None
+
+    if not conteudo:
+        return None
+
+    # tokenização (translate/split) e Counter (contagem) rodam ambos em C;
+    # o Python só orquestra, então o loop quente fica fora do interpretador
+    tokens = _tokenizar_bytes(conteudo)
+    return caminho, conteudo, Counter(tokens), len(tokens)
+
 
 class IndexadorInvertido:
     """
@@ -19,31 +169,34 @@ class IndexadorInvertido:
     def __init__(self):
         self.trie = Trie()
         self.postings = defaultdict(dict)      # termo -> {doc: tf}
+        self.doc_ids = {}                      # caminho -> id inteiro sequencial
+        self.docs_por_id = []                  # id -> caminho
+        self.doc_relpath = {}                  # caminho -> caminho relativo ao corpus (pra URL)
         self.documentos = {}                   # doc -> texto bruto
+        self.documentos_lower = {}             # doc -> texto em minúsculas (preenchido sob demanda)
+        self.posicoes_tokens = {}              # doc -> {token: primeira posição} (sob demanda)
         self.metadados_documentos = {}         # doc -> metadados simples
         self.estatisticas_globais = {
             "total_documentos": 0,
             "total_palavras": 0,
             "palavras_unicas": 0
         }
+        self._zscore_stats = {}                # termo -> (média, desvio) dos tfs
         self.indice_carregado = False
+        self.versao_indice = 0                 # incrementa a cada (re)carga do índice
 
     # ---------- utilidades de processamento de texto ----------
 
-    _RE_TOKEN = re.compile(r"[a-z0-9]+", re.IGNORECASE)
-
-    def _normalizar(self, texto: str) -> str:
-        """Minúsculas + troca pontuação por espaço (simples e eficaz)."""
-        return re.sub(r"[^\w\s]", " ", texto.lower())
+    # o regex continua usado onde precisamos de posições em str (snippets)
+    _RE_TOKEN = _RE_TOKEN
 
     def _tokenizar(self, texto: str) -> list[str]:
         """
-        Extrai palavras (letras/dígitos) e remove tokens muito curtos (<=2),
-        que normalmente são ruído para este corpus.
+        Extrai palavras (letras/dígitos ASCII) com 3+ caracteres via passada
+        única de translate/split sobre os bytes do texto, descartando as
+        stopwords de _STOPWORDS.
         """
-        texto = self._normalizar(texto)
-        tokens = self._RE_TOKEN.findall(texto)
-        return [t for t in tokens if len(t) > 2]
+        return _tokenizar_bytes(texto)
 
     # ---------- indexação ----------
 
@@ -55,31 +208,94 @@ class IndexadorInvertido:
         - atualiza postings (contagem tf)
         - armazena metadados básicos
         """
+        # contagem via Counter: o loop de contagem roda em C, não em bytecode
         tokens = self._tokenizar(conteudo)
+        self._registrar_documento(caminho, conteudo, Counter(tokens), len(tokens))
+
+    def _registrar_documento(self, caminho: str, conteudo: str, tf_doc: dict, num_tokens: int,
+                             atualizar_trie: bool = True):
+        """
+        Mescla no índice um documento já lido e tokenizado (pelo próprio
+        indexar_documento ou por um worker do pool).
+        indexar_corpus passa atualizar_trie=False e reconstrói a Trie em
+        lote no final (uma inserção por termo, em ordem lexicográfica).
+        """
+        # uma única instância canônica do caminho: postings, metadados e
+        # documentos passam a compartilhar o mesmo objeto como chave
+        caminho = sys.intern(caminho)
+
+        # id inteiro do documento (usado pela álgebra booleana da busca)
+        self._atribuir_id_documento(caminho)
 
         # guarda texto bruto (para snippet)
         self.documentos[caminho] = conteudo
 
-        # metadados simples
+        # metadados simples (palavras únicas = chaves da contagem, sem 2ª passada)
         self.metadados_documentos[caminho] = {
             "tamanho": len(conteudo),
-            "num_palavras": len(tokens),
-            "palavras_unicas": len(set(tokens))
+            "num_palavras": num_tokens,
+            "palavras_unicas": len(tf_doc)
         }
 
-        # contagem por termo no documento
-        tf_doc = Counter(tokens)
-
         # atualiza estruturas
         for termo, tf in tf_doc.items():
-            # 1) presença na Trie (sua API atual pede termo + arquivo)
-            self.trie.inserir(termo, caminho)
-            # 2) contagem para ranking
-            self.postings[termo][caminho] = self.postings[termo].get(caminho, 0) + tf
+            # contagem para ranking (liga o dict interno uma vez só)
+            d = self.postings[termo]
+            d[caminho] = d.get(caminho, 0) + tf
+            # média/desvio do termo mudaram: invalida a estatística cacheada
+            self._zscore_stats.pop(termo, None)
+
+        # presença na Trie (na indexação de corpus fica pra reconstrução em lote)
+        if atualizar_trie:
+            for termo in tf_doc:
+                self.trie.inserir(termo, caminho)
 
         # estatística global simples
         self.estatisticas_globais["total_documentos"] += 1
-        self.estatisticas_globais["total_palavras"] += len(tokens)
+        self.estatisticas_globais["total_palavras"] += num_tokens
+
+    def _atribuir_id_documento(self, caminho: str) -> int:
+        """
+        Garante um id inteiro sequencial para o documento e o devolve.
+        Operar sobre ids pequenos evita hash de strings longas de caminho
+        nas interseções/uniões da busca booleana.
+        """
+        caminho = sys.intern(caminho)
+        id_doc = self.doc_ids.get(caminho)
+        if id_doc is None:
+            id_doc = len(self.docs_por_id)
+            self.doc_ids[caminho] = id_doc
+            self.docs_por_id.append(caminho)
+        return id_doc
+
+    def obter_conteudo_lower(self, caminho: str) -> str:
+        """
+        Retorna o conteúdo do documento em minúsculas, calculando uma única
+        vez por documento (usado pelos snippets a cada busca).
+        """
+        texto = self.documentos_lower.get(caminho)
+        if texto is None:
+            conteudo = self.documentos.get(caminho, "")
+            texto = conteudo.lower()
+            if conteudo:
+                self.documentos_lower[caminho] = texto
+        return texto
+
+    def obter_primeiras_posicoes(self, caminho: str) -> dict:
+        """
+        Mapa {token: posição da primeira ocorrência} do documento, construído
+        uma única vez sob demanda. Permite ao snippet achar o primeiro termo
+        com uma consulta de dicionário em vez de varrer o texto inteiro.
+        """
+        posicoes = self.posicoes_tokens.get(caminho)
+        if posicoes is None:
+            posicoes = {}
+            for m in self._RE_TOKEN.finditer(self.obter_conteudo_lower(caminho)):
+                token = m.group()
+                if token not in posicoes:
+                    posicoes[token] = m.start()
+            self.posicoes_tokens[caminho] = posicoes
+        return posicoes
 
     def obter_titulo_documento(self, caminho: str) -> str:
         """
@@ -104,10 +320,11 @@ class IndexadorInvertido:
         if not os.path.exists(pasta_corpus):
             raise FileNotFoundError(f"Pasta do corpus não encontrada: {pasta_corpus}")
 
-        docs = 0
         categorias = ["business", "entertainment", "politics", "sport", "tech"]
         print("Iniciando indexação do corpus BBC...")
 
+        # 1ª fase: junta todos os caminhos (leitura+tokenização são paralelizáveis)
+        caminhos = []
         for categoria in categorias:
             pasta = os.path.join(pasta_corpus, categoria)
             if not os.path.isdir(pasta):
@@ -118,52 +335,161 @@ class IndexadorInvertido:
                 if not nome.lower().endswith(".txt"):
                     continue
                 caminho = os.path.join(pasta, nome)
-                try:
-                    with open(caminho, "r", encoding="utf-8", errors="ignore") as f:
-                        conteudo = f.read().strip()
-                    if conteudo:
-                        self.indexar_documento(caminho, conteudo)
-                        docs += 1
-                        if docs % 100 == 0:
-                            print(f"Documentos processados: {docs}")
-                except Exception as e:
-                    print(f"Erro ao processar {caminho}: {e}")
+                # caminho relativo pronto pra montar URLs (evita relpath por resultado)
+                self.doc_relpath[caminho] = os.path.join(categoria, nome)
+                caminhos.append(caminho)
+
+        # 2ª fase: workers leem e tokenizam; a thread principal só mescla
+        # (chunksize amortiza o custo de IPC por arquivo)
+        docs = 0
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            for resultado in executor.map(_processar_arquivo, caminhos, chunksize=32):
+                if resultado is None:
+                    continue
+                caminho, conteudo, tf_doc, num_tokens = resultado
+                self._registrar_documento(caminho, conteudo, tf_doc, num_tokens,
+                                          atualizar_trie=False)
+                docs += 1
+                if docs % 100 == 0:
+                    print(f"Documentos processados: {docs}")
+
+        # poda termos quase onipresentes (df > 95% dos docs): agem como
+        # stopwords específicas do corpus que a lista fixa não conhece
+        limite_df = 0.95 * docs
+        for termo in [t for t, d in self.postings.items() if len(d) > limite_df]:
+            del self.postings[termo]
+            self._zscore_stats.pop(termo, None)
+
+        # Trie construída uma vez no final, em ordem lexicográfica: uma
+        # descida por termo único, sem as divisões repetidas que a ordem
+        # de chegada dos documentos provoca
+        self.trie = Trie()
+        for termo in sorted(self.postings):
+            self.trie.inserir_varios(termo, self.postings[termo].keys())
 
         # palavras únicas = número de termos no índice
         self.estatisticas_globais["palavras_unicas"] = len(self.postings)
+        self._precalcular_stats_zscore()
         self.indice_carregado = True
+        self.versao_indice += 1
         print(f"Indexação concluída! {docs} documentos processados.")
         return docs
 
     # ---------- API para a busca ----------
 
-    def obter_postings(self, termo: str) -> dict:
-        """Retorna {documento: tf} para um termo (pode ser {})."""
-        return dict(self.postings.get(termo, {}))
+    # visão vazia compartilhada para termos fora do índice
+    _POSTINGS_VAZIO = MappingProxyType({})
+
+    def obter_postings(self, termo: str):
+        """
+        Retorna uma visão somente-leitura de {documento: tf} para um termo
+        (pode ser vazia). Antes copiava o dict inteiro a cada chamada; quem
+        precisar de uma cópia mutável faz dict(...) explicitamente.
+        """
+        docs_tf = self.postings.get(termo)
+        if docs_tf is None:
+            return self._POSTINGS_VAZIO
+        return MappingProxyType(docs_tf)
+
+    @staticmethod
+    def _stats_do_termo(docs_tf: dict) -> tuple:
+        """
+        (média, desvio populacional) dos tfs de um termo, em uma passada.
+        Usa var = E[tf²] − média²: como os tfs são inteiros, as duas somas
+        são exatas, então sai com metade das operações da forma
+        sum((v − média)²) sem perder precisão.
+        """
+        soma = 0
+        soma2 = 0
+        for v in docs_tf.values():
+            soma += v
+            soma2 += v * v
+        n = len(docs_tf)
+        media = soma / n
+        var = soma2 / n - media * media
+        return media, (math.sqrt(var) if var > 0 else 0.0)
+
+    def _precalcular_stats_zscore(self):
+        """
+        Pré-calcula (média, desvio) do tf de cada termo. Média e desvio só
+        dependem do índice, não do documento consultado, então são
+        computados uma vez por (re)construção do índice em vez de uma vez
+        por chamada de calcular_zscore.
+        """
+        stats = self._stats_do_termo
+        self._zscore_stats = {
+            termo: stats(docs_tf) for termo, docs_tf in self.postings.items()
+        }
+
+    def obter_stats_termo(self, termo: str) -> tuple:
+        """
+        (média, desvio) cacheados do termo; calcula (e guarda) na primeira
+        consulta se a estatística tiver sido invalidada por reindexação.
+        """
+        stats = self._zscore_stats.get(termo)
+        if stats is None:
+            docs_tf = self.postings.get(termo)
+            if not docs_tf:
+                return (0.0, 0.0)
+            stats = self._stats_do_termo(docs_tf)
+            self._zscore_stats[termo] = stats
+        return stats
 
     def calcular_zscore(self, termo: str, documento: str) -> float:
         """
         z-score = (tf_doc - média) / desvio_padrão
-        média e desvio são calculados sobre os documentos onde o termo aparece.
+        média e desvio vêm pré-calculados por termo (O(1) por chamada).
         Se variância = 0 ou termo ausente, retorna 0.
         """
-        docs_tf = self.postings.get(termo, {})
+        docs_tf = self.postings.get(termo)
         if not docs_tf:
             return 0.0
 
-        valores = list(docs_tf.values())
-        media = sum(valores) / len(valores)
-        var = sum((v - media) ** 2 for v in valores) / len(valores)  # variância populacional
-        desvio = math.sqrt(var) if var > 0 else 0.0
-
-        tf_doc = docs_tf.get(documento, 0)
+        media, desvio = self.obter_stats_termo(termo)
         if desvio == 0.0:
             return 0.0
-        return (tf_doc - media) / desvio
+        return (docs_tf.get(documento, 0) - media) / desvio
 
-    # ---------- persistência em formato próprio (texto) ----------
+    # ---------- persistência ----------
 
     def salvar_indice(self, caminho_arquivo: str):
+        """
+        Salva o índice em binário (pickle, protocolo 5): a carga vira um
+        único pickle.load que reconstrói os dicts em C, sem parsear
+        termo|doc:tf por linha. O formato texto antigo continua disponível
+        em salvar_indice_txt para inspeção humana, e índices texto antigos
+        ainda são aceitos por carregar_indice.
+        """
+        # Postings vão comprimidos: cada termo vira dois blobs de varints
+        # (deltas dos ids ordenados + tfs). Os caminhos longos dos docs
+        # aparecem uma vez só, na tabela id -> caminho, em vez de uma vez
+        # por posting como no formato texto.
+        doc_ids = self.doc_ids
+        postings_bin = {}
+        for termo, docs_tf in self.postings.items():
+            pares = sorted((doc_ids[doc], tf) for doc, tf in docs_tf.items())
+            deltas = []
+            tfs = []
+            anterior = 0
+            for id_doc, tf in pares:
+                deltas.append(id_doc - anterior)
+                anterior = id_doc
+                tfs.append(tf)
+            postings_bin[termo] = (_varint_bytes(deltas), _varint_bytes(tfs))
+
+        payload = {
+            "estatisticas": self.estatisticas_globais,
+            "metadados": self.metadados_documentos,
+            "postings": postings_bin,
+            "docs": list(self.docs_por_id),
+        }
+        # buffer de 1MB: o pickle escreve em blocos pequenos; isso agrupa
+        # as idas ao sistema de arquivos
+        with open(caminho_arquivo, "wb", buffering=1 << 20) as f:
+            pickle.dump(payload, f, protocol=5)
+        print(f"Índice salvo em: {caminho_arquivo}")
+
+    def salvar_indice_txt(self, caminho_arquivo: str):
         """
         Salva tudo em um arquivo texto simples com seções.
         Formato:
@@ -195,9 +521,9 @@ class IndexadorInvertido:
 
     def carregar_indice(self, caminho_arquivo: str, pasta_corpus: str) -> bool:
         """
-        Lê o arquivo de índice e reconstrói:
+        Lê o arquivo de índice (binário ou texto) e reconstrói:
           - postings (com tf)
-          - presença na Trie (inserindo 1x por doc, pois a Trie só guarda presença)
+          - presença na Trie (inserindo 1x por termo, pois a Trie só guarda presença)
           - documentos (conteúdo bruto) para snippet
         """
         if not os.path.exists(caminho_arquivo):
@@ -206,55 +532,36 @@ class IndexadorInvertido:
         try:
             self.trie = Trie()
             self.postings = defaultdict(dict)
+            self.doc_ids = {}
+            self.docs_por_id = []
+            self.doc_relpath = {}
             self.documentos = {}
+            self.documentos_lower = {}
+            self.posicoes_tokens = {}
             self.metadados_documentos = {}
+            self._zscore_stats = {}
             self.estatisticas_globais = {
                 "total_documentos": 0,
                 "total_palavras": 0,
                 "palavras_unicas": 0
             }
 
-            with open(caminho_arquivo, "r", encoding="utf-8") as f:
-                linhas = [ln.rstrip("\n") for ln in f]
-
-            modo = None
-            docs_list = []
-
-            for linha in linhas:
-                if not linha or linha.startswith("#"):
-                    if linha == "# ESTATISTICAS_GLOBAIS":
-                        modo = "est"
-                    elif linha == "# METADADOS_DOCUMENTOS":
-                        modo = "meta"
-                    elif linha == "# DOCUMENTOS":
-                        modo = "docs"
-                    elif linha == "# POSTINGS":
-                        modo = "postings"
-                    continue
-
-                if modo == "est":
-                    self.estatisticas_globais = json.loads(linha)
-                elif modo == "meta":
-                    self.metadados_documentos = json.loads(linha)
-                elif modo == "docs":
-                    docs_list = json.loads(linha)
-                elif modo == "postings":
-                    termo, serial = linha.split("|", 1)
-                    if serial:
-                        for par in serial.split(";"):
-                            doc, tf = par.split(":")
-                            tf = int(tf)
-                            self.postings[termo][doc] = tf
-                            # presença na Trie: uma única inserção por doc é suficiente
-                            self.trie.inserir(termo, doc)
-
-            # carrega os conteúdos dos documentos (para snippet)
+            # pickle (protocolo >= 2) sempre começa com 0x80; o formato
+            # texto começa com '#', então um byte decide o parser
+            with open(caminho_arquivo, "rb") as f:
+                primeiro_byte = f.read(1)
+            if primeiro_byte == b"\x80":
+                docs_list = self._carregar_indice_bin(caminho_arquivo)
+            else:
+                docs_list = self._carregar_indice_txt(caminho_arquivo)
+
+            # conteúdo fica sob demanda: nada é lido do disco agora, cada
+            # documento só é aberto quando um snippet/título precisar dele
+            docs_list = [sys.intern(caminho) for caminho in docs_list]
+            self.documentos = _DocumentosSobDemanda(docs_list)
             for caminho in docs_list:
-                try:
-                    with open(caminho, "r", encoding="utf-8", errors="ignore") as f:
-                        self.documentos[caminho] = f.read()
-                except Exception as e:
-                    print(f"Aviso: não consegui abrir {caminho}: {e}")
+                self._atribuir_id_documento(caminho)
+                self.doc_relpath[caminho] = os.path.relpath(caminho, pasta_corpus)
 
             # garante números coerentes
             self.estatisticas_globais["total_documentos"] = max(
@@ -263,10 +570,93 @@ class IndexadorInvertido:
             )
             self.estatisticas_globais["palavras_unicas"] = len(self.postings)
 
+            self._precalcular_stats_zscore()
             self.indice_carregado = True
+            self.versao_indice += 1
             print("Índice carregado com sucesso.")
             return True
 
         except Exception as e:
             print(f"Erro ao carregar índice: {e}")
             return False
+
+    def _carregar_indice_bin(self, caminho_arquivo: str) -> list:
+        """
+        Carrega o formato binário (pickle). Retorna a lista de caminhos de
+        documentos; postings/metadados/estatísticas são atribuídos direto.
+        """
+        # buffer de 1MB: o pickle lê aos pedaços; leituras sequenciais
+        # grandes custam menos syscalls
+        with open(caminho_arquivo, "rb", buffering=1 << 20) as f:
+            payload = pickle.load(f)
+
+        self.estatisticas_globais = payload["estatisticas"]
+        self.metadados_documentos = payload["metadados"]
+
+        # a tabela id -> caminho vem primeiro, para decodificar os postings
+        docs_list = payload["docs"]
+        for caminho in docs_list:
+            self._atribuir_id_documento(caminho)
+        docs_por_id = self.docs_por_id
+
+        # desfaz delta+varint e reconstrói a Trie em lote, em ordem
+        # lexicográfica (divisões baratas)
+        postings_bin = payload["postings"]
+        for termo in sorted(postings_bin):
+            blob_deltas, blob_tfs = postings_bin[termo]
+            docs_tf = {}
+            id_doc = 0
+            for delta, tf in zip(_varint_lista(blob_deltas), _varint_lista(blob_tfs)):
+                id_doc += delta
+                docs_tf[docs_por_id[id_doc]] = tf
+            self.postings[termo] = docs_tf
+            self.trie.inserir_varios(termo, docs_tf.keys())
+
+        return docs_list
+
+    def _carregar_indice_txt(self, caminho_arquivo: str) -> list:
+        """
+        Carrega o formato texto antigo (seções + termo|doc:tf;...).
+        O arquivo tem 4 seções fixas, então um split pelos cabeçalhos
+        despacha cada bloco inteiro de uma vez, em vez de testar 4
+        prefixos em cada linha numa máquina de estados.
+        Retorna a lista de caminhos de documentos.
+        """
+        with open(caminho_arquivo, "r", encoding="utf-8") as f:
+            bruto = f.read()
+
+        # "\n# " só aparece em cabeçalho de seção (o 1º bloco começa em "# ")
+        secoes = {}
+        for bloco in bruto.split("\n# "):
+            if bloco.startswith("# "):
+                bloco = bloco[2:]
+            nome, _, corpo = bloco.partition("\n")
+            secoes[nome] = corpo
+
+        if secoes.get("ESTATISTICAS_GLOBAIS", "").strip():
+            self.estatisticas_globais = json.loads(secoes["ESTATISTICAS_GLOBAIS"])
+        if secoes.get("METADADOS_DOCUMENTOS", "").strip():
+            self.metadados_documentos = json.loads(secoes["METADADOS_DOCUMENTOS"])
+        docs_list = []
+        if secoes.get("DOCUMENTOS", "").strip():
+            docs_list = json.loads(secoes["DOCUMENTOS"])
+
+        for linha in secoes.get("POSTINGS", "").splitlines():
+            if not linha:
+                continue
+            termo, serial = linha.split("|", 1)
+            if serial:
+                docs_tf = self.postings[termo]
+                for par in serial.split(";"):
+                    doc, tf = par.split(":")
+                    # o split cria uma string nova por posting; internar faz
+                    # todas as ocorrências do caminho virarem um objeto só
+                    doc = sys.intern(doc)
+                    self._atribuir_id_documento(doc)
+                    docs_tf[doc] = int(tf)
+                # presença na Trie em lote: uma descida por termo, não
+                # uma por posting (os termos já vêm ordenados do salvar,
+                # o que mantém as divisões da trie compacta baratas)
+                self.trie.inserir_varios(termo, docs_tf.keys())
+
+        return docs_list
@@ -1,11 +1,27 @@
 # Trie compacta
 # Guarda prefixo das chaves comuns
 # Valores apenas nas folhas
+#
+# filhos indexa por primeiro caractere: {char: (rotulo_completo, Node)}.
+# Como rótulos irmãos numa trie compacta nunca começam pela mesma letra,
+# achar o filho certo vira uma única consulta de dicionário em vez de
+# comparar o padrão contra todos os rótulos do nó.
+#
+# Rótulos de aresta passam por sys.intern: o mesmo sufixo reaparece em
+# milhares de inserções durante a indexação, e strings internadas são
+# comparadas por ponteiro no caminho rápido do dict do CPython.
+
+import sys
 
 class Node:
-    # Construtor do nó  
-    def __init__(self): 
-        self.filhos = {} # Todos os filhos do nó
+    # __slots__ tira o __dict__ por nó: ~29 mil termos geram centenas de
+    # milhares de nós, e cada um fica ~3x menor e com acesso a atributo
+    # mais direto (offset fixo em vez de consulta de dicionário)
+    __slots__ = ("filhos", "arquivos", "folha")
+
+    # Construtor do nó
+    def __init__(self):
+        self.filhos = {} # char inicial -> (rotulo da aresta, nó filho)
         self.arquivos = set() # Arquivos em que o padrao aparece
         self.folha = False # Indica se é folha, consequentemente se tem valor
 
@@ -17,8 +33,12 @@ class Trie:
 
     # Retorna comprimento do prefixo comum entre a e b
     def tam_prefixo_comum(self, a: str, b: str) -> int:
-        i = 0
         limite = min(len(a), len(b)) # retoorna o menor tamanho entre a e b
+        # caso mais frequente na descida: um é prefixo do outro — uma única
+        # comparação de fatia em C resolve, sem loop por caractere
+        if a[:limite] == b[:limite]:
+            return limite
+        i = 0
         while i < limite and a[i] == b[i]:
             i += 1
         return  i
@@ -29,98 +49,116 @@ class Trie:
         node = self.raiz
         # Vai consumindo o padrão até não restar nada
         while padrao:
-            # Itera sobre as chaves atuais.
-            for chave in list(node.filhos.keys()): # Lista todos os filhos do nó atual
-                comum = self.tam_prefixo_comum(chave, padrao)
-                # Se não tem nenhum prefixo comum, pula pro proximo filho da lista
-                if comum == 0:
-                    continue
-
-                # Caso 1: o nó atual é prefixo do padrao (ex: chave="ca", padrao="casa")
-                if comum == len(chave):
-                    padrao = padrao[comum:]  # Consome o prefixo comum do padrao ex: "casa -> "sa"/pega os ultimos "comum" caracteres
-                    node = node.filhos[chave] # Desce o nó de análise para o proximo nível
-                    break  # volta ao while externo para continuar com o resto do padrao, funciona pois agora o nó foi atualizado
-
-                # Caso 2: o padrao é prefixo do nó atual (ex: chave="casa", padrao="ca")
-                # Divide o nó atual em dois nós, chave = prefixo comum + resto do padrão
-                prefixo_comum = chave[:comum]           
-                restante_chave = chave[comum:]
-
-                # Realoca o filho existente sob um novo nó intermediário
-                filho_existente = node.filhos.pop(chave)  # Remove a chave antiga (lembrando que estamos o nó é a raiz)
-                novo_no = Node() # Cria um novo nó intermediário
-                novo_no.filhos[restante_chave] = filho_existente # filho_existente agora é só a parte não comum
-                node.filhos[prefixo_comum] = novo_no # raiz agora aponta pro nó intermediario "ca"
-
-                padrao_resto = padrao[comum:] # Tira também o prefixo comum do padrão
-
-                if padrao_resto == "": # Padrão foi consumido = adiciona valor
-                    novo_no.folha = True
-                    novo_no.arquivos.add(arquivo)
-                else:
-                    # Se ainda resta parte do padrão, adocopma e, novo nó filho
-                    no_filho_do_padrao = Node()
-                    no_filho_do_padrao.folha = True
-                    no_filho_do_padrao.arquivos.add(arquivo)
-                    novo_no.filhos[padrao_resto] = no_filho_do_padrao
-                return  
+            # Uma consulta pelo 1º caractere decide o filho (ou a ausência dele)
+            entrada = node.filhos.get(padrao[0])
 
-            else:
-                # Caso 3 = Não tem prefixo comum com os filhos -> novo nó com o restante do padrao
+            # Caso 3 = Não tem filho começando igual -> novo nó com o restante do padrao
+            if entrada is None:
                 novo = Node()
                 novo.folha = True
                 novo.arquivos.add(arquivo)
-                node.filhos[padrao] = novo # Adicionsa o novo nó como filho da raiz
+                node.filhos[padrao[0]] = (sys.intern(padrao), novo)
                 return
 
+            chave, filho = entrada
+            comum = self.tam_prefixo_comum(chave, padrao)  # >= 1, 1º char já bateu
+
+            # Caso 1: o nó atual é prefixo do padrao (ex: chave="ca", padrao="casa")
+            if comum == len(chave):
+                padrao = padrao[comum:]  # Consome o prefixo comum do padrao ex: "casa" -> "sa"
+                node = filho # Desce o nó de análise para o proximo nível
+                continue  # continua o while externo com o resto do padrao
+
+            # Caso 2: prefixo comum parcial (ex: chave="casa", padrao="cano")
+            # Divide a aresta em duas: prefixo comum + restos
+            prefixo_comum = sys.intern(chave[:comum])
+            restante_chave = sys.intern(chave[comum:])
+
+            # Realoca o filho existente sob um novo nó intermediário
+            novo_no = Node() # Cria um novo nó intermediário
+            novo_no.filhos[restante_chave[0]] = (restante_chave, filho) # só a parte não comum
+            node.filhos[prefixo_comum[0]] = (prefixo_comum, novo_no) # substitui a aresta antiga
+
+            padrao_resto = padrao[comum:] # Tira também o prefixo comum do padrão
+
+            if padrao_resto == "": # Padrão foi consumido = adiciona valor
+                novo_no.folha = True
+                novo_no.arquivos.add(arquivo)
+            else:
+                # Se ainda resta parte do padrão, vira um novo nó filho
+                no_filho_do_padrao = Node()
+                no_filho_do_padrao.folha = True
+                no_filho_do_padrao.arquivos.add(arquivo)
+                novo_no.filhos[padrao_resto[0]] = (sys.intern(padrao_resto), no_filho_do_padrao)
+            return
+
         # Se chega aqui é porque o padrão foi consumido completamente
         node.folha = True
         node.arquivos.add(arquivo)
 
+    # Insere padrao associado a vários arquivos de uma vez
+    # (uma descida só, em vez de uma por arquivo — usado na recarga do índice)
+    def inserir_varios(self, padrao: str, arquivos):
+        if not padrao:
+            return
+        # A 1ª inserção cria o caminho e marca a folha
+        arquivos = iter(arquivos)
+        primeiro = next(arquivos, None)
+        if primeiro is None:
+            return
+        self.inserir(padrao, primeiro)
+
+        # Desce uma única vez até a folha do padrão e junta o resto
+        node = self.raiz
+        while padrao:
+            chave, node = node.filhos[padrao[0]]
+            padrao = padrao[len(chave):]
+        node.arquivos.update(arquivos)
+
     # Remove padrao associado a um arquivo da Trie (recursivamente)
     def remover(self, padrao: str, arquivo: str):
         # Função recursiva: retorna True se o padrão foi removido
         def pode_remover(node, padrao):
-            for chave, filho in list(node.filhos.items()):  # Itera sobre os filhos
-                comum = self.tam_prefixo_comum(chave, padrao)
+            # Mesmo despacho pelo 1º caractere usado na inserção
+            entrada = node.filhos.get(padrao[0]) if padrao else None
+            if entrada is None:
+                # Nenhum filho tem prefixo comum com o padrão
+                return False
 
-                # Se não tem prefixo comum, passa pro próximo filho
-                if comum == 0:
-                    continue
+            chave, filho = entrada
+            comum = self.tam_prefixo_comum(chave, padrao)
 
-                # Se o prefixo em comum é menor que padrão e que a chave então não tem valor associado
-                if comum < len(chave) and comum < len(padrao):
-                    return False
+            # Se o prefixo em comum é menor que padrão e que a chave então não tem valor associado
+            if comum < len(chave) and comum < len(padrao):
+                return False
 
-                # Padrão foi totalmente consumido no nó atual
-                elif comum == len(padrao) and comum <= len(chave):
-                    if arquivo in filho.arquivos:
-                        filho.arquivos.remove(arquivo)
+            # Padrão foi totalmente consumido no nó atual
+            elif comum == len(padrao) and comum <= len(chave):
+                if arquivo in filho.arquivos:
+                    filho.arquivos.remove(arquivo)
 
-                    # Se não tem mais arquivos associados tira o valor associado
-                    if not filho.arquivos:
-                        filho.folha = False
+                # Se não tem mais arquivos associados tira o valor associado
+                if not filho.arquivos:
+                    filho.folha = False
 
-                    # Remove o nó se ele estiver completamente vazio
-                    if not filho.filhos and not filho.folha:
-                        node.filhos.pop(chave)
+                # Remove o nó se ele estiver completamente vazio
+                if not filho.filhos and not filho.folha:
+                    node.filhos.pop(chave[0])
 
-                    return True  # Padrão removido 
+                return True  # Padrão removido
 
-                # Padrão continua no filho
-                elif comum == len(chave) and comum < len(padrao): # Ou seja o padrão é maior que a chave do nó
-                    padrao_resto = padrao[comum:]
-                    removido = pode_remover(filho, padrao_resto)
+            # Padrão continua no filho
+            elif comum == len(chave) and comum < len(padrao): # Ou seja o padrão é maior que a chave do nó
+                padrao_resto = padrao[comum:]
+                removido = pode_remover(filho, padrao_resto)
 
-                    # Verifica se todos os filhos do nó filho foram removidos e se tem valor associado
-                    if removido and not filho.filhos and not filho.folha:
-                        node.filhos.pop(chave)
+                # Verifica se todos os filhos do nó filho foram removidos e se tem valor associado
+                if removido and not filho.filhos and not filho.folha:
+                    node.filhos.pop(chave[0])
 
-                    return removido
+                return removido
 
-            # Nenhum filho tem prefixo comum com o padrão
             return False
 
         # Remove começando da raiz e retorna se deu certo
-        return pode_remover(self.raiz, padrao)
\ No newline at end of file
+        return pode_remover(self.raiz, padrao)
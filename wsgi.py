@@ -0,0 +1,10 @@
+# Ponto de entrada WSGI para produção
+# O servidor de desenvolvimento do Flask (app.run) roda uma requisição por vez;
+# com gunicorn cada worker atende em paralelo:
+#
+#     gunicorn -w 4 -k gthread --threads 2 wsgi:app
+#
+from app import app, inicializar_sistema
+
+# Carrega/cria o índice uma única vez por worker, antes da primeira requisição
+inicializar_sistema()